@@ -1,12 +1,15 @@
 #!/usr/bin/env python3
+import codecs
 import csv
-import json
+import orjson
 import re
 import requests
 import io
+import mmap
 import sys
 import os
 from io import StringIO
+from operator import itemgetter
 
 # Set UTF-8 as default encoding for all I/O operations
 if sys.stdout.encoding != 'utf-8':
@@ -17,32 +20,58 @@ GOOGLE_SHEETS_URL = "https://docs.google.com/spreadsheets/d/e/2PACX-1vQ2JYD9F35V
 # Alternative format that might avoid encoding issues
 GOOGLE_SHEETS_XLSX_URL = "https://docs.google.com/spreadsheets/d/e/2PACX-1vQ2JYD9F35V9EfYtV7sqPx8DpCx-kDEQgSTbnKoQRCljpszh6cUNO3lGrx6tl52SwGrJLwlzBPtNt1M/pub?output=xlsx"
 
-def clean_string(s):
-    """Clean string values and handle NaN/empty values"""
-    if not s or s.lower() == 'nan' or s == '':
-        return None
-    return s.strip()
+# Word type spellings found in the sheet, combined into one pattern so each
+# row needs a single regex pass. The anchored lookaheads are tried in order,
+# so the first spelling listed wins wherever it appears in the cell (e.g.
+# "irregular ru-verb" is verb-ru). Add other mappings as needed
+TYPE_RE = re.compile(
+    r'^(?:(?=.*(?P<ru>ru-verb))|(?=.*(?P<u>u-verb))|(?=.*(?P<irr>irregular)))',
+    re.IGNORECASE | re.S,
+)
+GROUP_TO_TYPE = {
+    "ru": "verb-ru",
+    "u": "verb-u",
+    "irr": "verb-irregular",
+}
 
-def download_and_save_file(url, output_path):
-    """Download file from URL and save to disk"""
-    response = requests.get(url)
-    response.raise_for_status()
-    
-    with open(output_path, 'wb') as f:
-        f.write(response.content)
-    
-    return output_path
+# Values already in the TypeScript WordType format need no mapping
+CANONICAL_WORD_TYPES = frozenset({
+    "verb-ru",
+    "verb-u",
+    "verb-irregular",
+    "noun",
+    "adjective-i",
+    "adjective-na",
+    "adverb",
+    "particle",
+    "expression",
+})
 
-def csv_to_typescript(output_file_path, csv_file_path=None, use_manual_download=False):
-    """Convert CSV from local file to TypeScript
-    
-    Args:
-        output_file_path: Path where to save the TypeScript output
-        csv_file_path: Path to a local CSV file (if provided)
-        use_manual_download: If True, suggests manual download instead of auto-fetching
-    """
-    # Define the TypeScript template with types and structure
-    typescript_header = """export interface ConjugationItem {
+# Bytes read from the start of the CSV to pick its encoding
+ENCODING_SAMPLE_SIZE = 64 * 1024
+
+# Block size for decoding the CSV
+READ_BLOCK_SIZE = 1024 * 1024
+
+# Write buffer for the generated TypeScript file
+OUTPUT_BUFFER_SIZE = 8 * 1024 * 1024
+
+# Compact JSON layout of a ConjugationItem, written one per line; each %b
+# takes an orjson-encoded value. Run a formatter over the generated file if
+# readable output is needed
+ITEM_TEMPLATE = (
+    b'{"Word":{"dictionary":{"kanji":%b,"hiragana":%b},"definition":%b,"type":%b},'
+    b'"Present Affirmative":{"kanji":%b,"hiragana":%b},'
+    b'"Present Negative":{"kanji":%b,"hiragana":%b},'
+    b'"Past Affirmative":{"kanji":%b,"hiragana":%b},'
+    b'"Past Negative":{"kanji":%b,"hiragana":%b},'
+    b'"Te Form":%b}'
+)
+TE_FORM_TEMPLATE = b'{"kanji":%b,"hiragana":%b}'
+
+# TypeScript template with types and structure, pre-encoded since the output
+# file is written in binary mode
+TYPESCRIPT_HEADER = b"""export interface ConjugationItem {
   Word: {
     // Dictionary form information
     dictionary: {
@@ -93,8 +122,76 @@ export type WordType =
 export const conjugationData: ConjugationItem[] = [
 """
 
-    typescript_footer = "]"
+TYPESCRIPT_FOOTER = b"]"
+
+# Consecutive rows of empty cells (",,,," padding from spreadsheet exports)
+# after which the rest of the sheet is not read. Blank lines do not count
+MAX_EMPTY_ROWS = 16
+
+def clean_string(s):
+    """Clean string values and handle NaN/empty values"""
+    if s is None:
+        return None
+    # Values are compared after stripping, so whitespace-only cells and a
+    # padded " nan " count as missing. The length check keeps lower() off
+    # the common path
+    s = s.strip()
+    if not s or (len(s) == 3 and s.lower() == 'nan'):
+        return None
+    return s
+
+def detect_encoding(csv_file_path):
+    """Guess the CSV encoding from a sample at the start of the file"""
+    with open(csv_file_path, 'rb') as f:
+        sample = f.read(ENCODING_SAMPLE_SIZE)
+    try:
+        # Decode incrementally so a multibyte character cut off by the end of
+        # the sample is not treated as an error
+        codecs.getincrementaldecoder('utf-8')().decode(sample)
+    except UnicodeDecodeError:
+        # Shift-JIS is common for Japanese CSV files
+        return 'shift_jis'
+    return 'utf-8'
 
+def iter_csv_lines(csv_file_path, encoding):
+    """Yield decoded lines of a CSV file, read through a read-only memory map"""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    with open(csv_file_path, 'rb') as f:
+        # mmap cannot map an empty file
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Decode in large blocks and split them the way a file opened
+            # with newline='' would, as the csv module expects
+            pending = ''
+            for start in range(0, len(mm), READ_BLOCK_SIZE):
+                text = pending + decoder.decode(mm[start:start + READ_BLOCK_SIZE])
+                lines = io.StringIO(text, newline='').readlines()
+                # The last line may continue in the next block
+                pending = lines.pop() if lines else ''
+                yield from lines
+            text = pending + decoder.decode(b'', final=True)
+            yield from io.StringIO(text, newline='').readlines()
+
+def download_and_save_file(url, output_path):
+    """Download file from URL and save to disk"""
+    response = requests.get(url)
+    response.raise_for_status()
+    
+    with open(output_path, 'wb') as f:
+        f.write(response.content)
+    
+    return output_path
+
+def csv_to_typescript(output_file_path, csv_file_path=None, use_manual_download=False, verbose=False):
+    """Convert CSV from local file to TypeScript
+    
+    Args:
+        output_file_path: Path where to save the TypeScript output
+        csv_file_path: Path to a local CSV file (if provided)
+        use_manual_download: If True, suggests manual download instead of auto-fetching
+        verbose: If True, print each word as it is processed
+    """
     conjugation_items = []
     
     if use_manual_download and not csv_file_path:
@@ -113,122 +210,155 @@ export const conjugationData: ConjugationItem[] = [
         print("Then run: python csv_to_typescript.py --local your_downloaded_file.csv")
         return
         
+    # Pick the encoding from a sample so the file is normally decoded once
+    encoding = detect_encoding(csv_file_path)
+    if encoding != 'utf-8':
+        print("UTF-8 encoding failed, trying with Shift-JIS encoding...")
     try:
-        # Process CSV file with explicit UTF-8 encoding
-        with open(csv_file_path, 'r', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            process_csv_rows(reader, conjugation_items)
+        reader = csv.reader(iter_csv_lines(csv_file_path, encoding))
+        process_csv_rows(reader, conjugation_items, verbose)
     except UnicodeDecodeError:
-        # If UTF-8 fails, try with Shift-JIS (common for Japanese CSV files)
+        if encoding != 'utf-8':
+            raise
+        # Non-UTF-8 bytes past the sample; start over with Shift-JIS
         print("UTF-8 encoding failed, trying with Shift-JIS encoding...")
-        with open(csv_file_path, 'r', encoding='shift_jis') as csvfile:
-            reader = csv.DictReader(csvfile)
-            process_csv_rows(reader, conjugation_items)
+        conjugation_items.clear()
+        reader = csv.reader(iter_csv_lines(csv_file_path, 'shift_jis'))
+        process_csv_rows(reader, conjugation_items, verbose)
 
     # Generate TypeScript code
-    with open(output_file_path, 'w', encoding='utf-8') as ts_file:
-        ts_file.write(typescript_header)
+    # A large write buffer amortizes syscalls across the many small chunks
+    # Items are already UTF-8 JSON bytes, so the file is written in binary mode
+    with open(output_file_path, 'wb', buffering=OUTPUT_BUFFER_SIZE) as ts_file:
+        ts_file.write(TYPESCRIPT_HEADER)
         
-        for i, item in enumerate(conjugation_items):
-            # Convert to formatted JSON string
-            json_str = json.dumps(item, ensure_ascii=False, indent=2)
-            
-            # Add comma after every item except the last one
-            if i < len(conjugation_items) - 1:
-                json_str += ","
-            
-            # Write the item to the TypeScript file
-            ts_file.write(f"  {json_str}")
+        # One item per line with a comma after every item except the last
+        # one, written ahead of the next item so no index bookkeeping is needed
+        separator = b"  "
+        for item in conjugation_items:
+            ts_file.write(separator)
+            ts_file.write(item)
+            separator = b",\n  "
+        if conjugation_items:
+            ts_file.write(b"\n")
         
-        ts_file.write(typescript_footer)
+        ts_file.write(TYPESCRIPT_FOOTER)
+
+def process_csv_rows(reader, conjugation_items, verbose=False):
+    """Process CSV rows into serialized conjugation items (JSON bytes)"""
+    # Bind everything the row loop uses to locals to skip global and
+    # attribute lookups on every row
+    dumps = orjson.dumps
+    clean = clean_string
+    append_item = conjugation_items.append
+    match_type = TYPE_RE.match
+    group_to_type = GROUP_TO_TYPE
+    canonical_types = CANONICAL_WORD_TYPES
+    item_template = ITEM_TEMPLATE
+    te_form_template = TE_FORM_TEMPLATE
+    max_empty_rows = MAX_EMPTY_ROWS
+    header = next(reader, None)
+    if header is None:
+        return
+
+    # Resolve column positions once from the header. Rows are normalized to
+    # the header width plus one trailing blank cell, which absent columns
+    # point at, so every cell can be fetched without bounds checks
+    idx = {name: i for i, name in enumerate(header)}
+    n_cols = len(header)
+    blank_row = [''] * (n_cols + 1)
+    absent = n_cols
+    I_def = idx.get('Definition', absent)
+    I_type = idx.get('Type', absent)
+    I_dh = idx.get('Vocab Dictionary Hiragana', absent)
+    I_dk = idx.get('Vocab dictionary Kanji', absent)
+    I_pah = idx.get('Present Postive Hiragana', absent)
+    I_pak = idx.get('Present Postive Kanji', absent)
+    I_mh = idx.get('Vocab Masu Hiragana', absent)
+    I_mk = idx.get('Vocab Masu Kanji', absent)
+    I_pnh = idx.get('Present Negative Hiragana', absent)
+    I_pnk = idx.get('Present Negative Kanji', absent)
+    I_fah = idx.get('Past Postive Hiragana', absent)
+    I_fak = idx.get('Past Postive Kanji', absent)
+    I_fnh = idx.get('Past Negatie Hiragana', absent)
+    I_fnk = idx.get('Past Negative Kanji', absent)
+    I_tk = idx.get('Te form Kanji', absent)
+    I_th = idx.get('Te form Hiragana', absent)
+
+    # Fetch and clean cells a whole row at a time. Present Affirmative falls
+    # back to the Vocab Masu columns before cleaning, so those raw cells are
+    # fetched separately
+    get_cells = itemgetter(I_def, I_type, I_dh, I_dk, I_pnh, I_pnk, I_fah, I_fak, I_fnh, I_fnk, I_tk, I_th)
+    get_present_cells = itemgetter(I_pah, I_mh, I_pak, I_mk)
+    get_essential_cells = itemgetter(I_dh, I_dk, I_def, I_type)
 
-def process_csv_rows(reader, conjugation_items):
-    """Process CSV rows into conjugation item objects"""
+    empty_streak = 0
     for row in reader:
+        # Skip blank lines the same way DictReader does
+        if not row:
+            continue
+        # Skip rows whose cells are all empty silently; a long run of them is
+        # spreadsheet padding, so stop reading there
+        if not any(row):
+            empty_streak += 1
+            if empty_streak > max_empty_rows:
+                print(f"Stopped after {empty_streak} consecutive empty rows")
+                break
+            continue
+        empty_streak = 0
+        row = row[:n_cols]
+        row += blank_row[len(row):]
+
+        # Skip rows with missing essential data before cleaning anything
+        raw_hiragana, raw_kanji, raw_definition, raw_type = get_essential_cells(row)
+        if not (raw_hiragana and raw_kanji and raw_definition and raw_type):
+            print(f"Skipping row due to missing essential data: {clean(raw_kanji) or 'Unknown'}")
+            continue
+
         # Extract values from CSV, handling potential column name variations
-        definition = clean_string(row.get('Definition'))
-        word_type = clean_string(row.get('Type'))
+        (definition, word_type,
+         dict_hiragana, dict_kanji,
+         present_neg_hiragana, present_neg_kanji,
+         past_aff_hiragana, past_aff_kanji,
+         past_neg_hiragana, past_neg_kanji,
+         te_form_kanji, te_form_hiragana) = map(clean, get_cells(row))
         
-        dict_hiragana = clean_string(row.get('Vocab Dictionary Hiragana'))
-        dict_kanji = clean_string(row.get('Vocab dictionary Kanji'))
-        
-        present_aff_hiragana = clean_string(row.get('Present Postive Hiragana') or row.get('Vocab Masu Hiragana'))
-        present_aff_kanji = clean_string(row.get('Present Postive Kanji') or row.get('Vocab Masu Kanji'))
-        
-        present_neg_hiragana = clean_string(row.get('Present Negative Hiragana'))
-        present_neg_kanji = clean_string(row.get('Present Negative Kanji'))
-        
-        past_aff_hiragana = clean_string(row.get('Past Postive Hiragana'))
-        past_aff_kanji = clean_string(row.get('Past Postive Kanji'))
-        
-        past_neg_hiragana = clean_string(row.get('Past Negatie Hiragana'))
-        past_neg_kanji = clean_string(row.get('Past Negative Kanji'))
-        
-        te_form_kanji = clean_string(row.get('Te form Kanji'))
-        te_form_hiragana = clean_string(row.get('Te form Hiragana'))
+        pos_hiragana, masu_hiragana, pos_kanji, masu_kanji = get_present_cells(row)
+        present_aff_hiragana = clean(pos_hiragana or masu_hiragana)
+        present_aff_kanji = clean(pos_kanji or masu_kanji)
         
         # Print some debug information to help diagnose encoding issues
-        if dict_kanji:
+        if verbose and dict_kanji:
             print(f"Processing: {dict_kanji} ({dict_hiragana})")
         
-        # Skip rows with missing essential data
+        # Essential cells may still clean to nothing (whitespace, 'nan')
         if not (dict_hiragana and dict_kanji and definition and word_type):
             print(f"Skipping row due to missing essential data: {dict_kanji if dict_kanji else 'Unknown'}")
             continue
             
         # Map the word type to the TypeScript enum format
-        type_mapping = {
-            "ru-verb": "verb-ru",
-            "u-verb": "verb-u",
-            "irregular": "verb-irregular",
-            # Add other mappings as needed
-        }
-        
-        # Use regex to determine if word type needs mapping
-        mapped_type = word_type
-        for pattern, type_value in type_mapping.items():
-            if re.search(pattern, word_type, re.IGNORECASE):
-                mapped_type = type_value
-                break
-        
-        # Create a conjugation item object
-        conjugation_item = {
-            "Word": {
-                "dictionary": {
-                    "kanji": dict_kanji,
-                    "hiragana": dict_hiragana
-                },
-                "definition": definition,
-                "type": mapped_type
-            },
-            "Present Affirmative": {
-                "kanji": present_aff_kanji,
-                "hiragana": present_aff_hiragana
-            },
-            "Present Negative": {
-                "kanji": present_neg_kanji,
-                "hiragana": present_neg_hiragana
-            },
-            "Past Affirmative": {
-                "kanji": past_aff_kanji,
-                "hiragana": past_aff_hiragana
-            },
-            "Past Negative": {
-                "kanji": past_neg_kanji,
-                "hiragana": past_neg_hiragana
-            }
-        }
+        if word_type in canonical_types:
+            mapped_type = word_type
+        else:
+            match = match_type(word_type)
+            mapped_type = group_to_type[match.lastgroup] if match else word_type
         
         # Handle Te form with dedicated columns for kanji and hiragana
         if te_form_kanji or te_form_hiragana:
-            conjugation_item["Te Form"] = {
-                "kanji": te_form_kanji or "",
-                "hiragana": te_form_hiragana or ""
-            }
+            te_form = te_form_template % (dumps(te_form_kanji or ""), dumps(te_form_hiragana or ""))
         else:
-            conjugation_item["Te Form"] = None
+            te_form = b"null"
         
-        conjugation_items.append(conjugation_item)
+        # Format the conjugation item straight to JSON bytes
+        append_item(item_template % (
+            dumps(dict_kanji), dumps(dict_hiragana),
+            dumps(definition), dumps(mapped_type),
+            dumps(present_aff_kanji), dumps(present_aff_hiragana),
+            dumps(present_neg_kanji), dumps(present_neg_hiragana),
+            dumps(past_aff_kanji), dumps(past_aff_hiragana),
+            dumps(past_neg_kanji), dumps(past_neg_hiragana),
+            te_form,
+        ))
 
 if __name__ == "__main__":
     import argparse
@@ -238,10 +368,12 @@ if __name__ == "__main__":
                         help='Path to a local CSV file (required due to encoding considerations)')
     parser.add_argument('--output', '-o', default='conjugation_data.ts', 
                         help='Path to the output TypeScript file (default: conjugation_data.ts)')
+    parser.add_argument('--verbose', '-v', action='store_true',
+                        help='Print each word as it is processed')
     
     args = parser.parse_args()
     
-    csv_to_typescript(args.output, args.local, use_manual_download=True)
+    csv_to_typescript(args.output, args.local, use_manual_download=True, verbose=args.verbose)
     
     if args.local:
         print(f"\nSuccessfully converted {args.local} to {args.output}")
\ No newline at end of file
@@ -1,10 +1,21 @@
 import json
+import mmap
+import os
 
 # Define TypeScript file
 TS_FILENAME = "data.ts"
 
+# Layout of the data array; one entry per line so appends only touch the tail
+TS_ARRAY_START = "export const conjugationData: ConjugationItem[] = [\n"
+TS_ARRAY_END = "];"
+# Block size for scanning back over trailing whitespace
+TAIL_SCAN_SIZE = 1024
+
 def placeholder(value, default="[PH]"):
-    return value.strip() if value and value.strip() else default
+    if not value:
+        return default
+    value = value.strip()
+    return value if value else default
 
 def get_user_input(prompt):
     return input(prompt).strip()
@@ -37,28 +48,69 @@ def create_new_entry():
         },
     }
 
+def write_new_ts_file(filename, entries):
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write(TS_ARRAY_START)
+        f.write(",\n".join("  " + json.dumps(entry, ensure_ascii=False) for entry in entries))
+        f.write("\n" + TS_ARRAY_END)
+
+def last_non_space(data, end):
+    """Return the offset and value of the last non-whitespace byte before end,
+    or (-1, b"") if there is none"""
+    while end > 0:
+        start = max(0, end - TAIL_SCAN_SIZE)
+        block = data[start:end].rstrip()
+        if block:
+            return start + len(block) - 1, block[-1:]
+        end = start
+    return -1, b""
+
 def append_to_ts_file(filename, new_entry):
+    entry = json.dumps(new_entry, ensure_ascii=False).encode("utf-8")
     try:
-        with open(filename, "r", encoding="utf-8") as f:
-            content = f.read()
-            json_data = content.split("=", 1)[1].strip().rstrip(";")
-            data = json.loads(json_data) if json_data else []
-        
-        data.append(new_entry)
+        with open(filename, "r+b") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                insert_at = None
+            else:
+                # Locate the end of the data array from the back of the file,
+                # skipping trailing whitespace and an optional semicolon
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    pos, last = last_non_space(mm, size)
+                    if last == b";":
+                        pos, last = last_non_space(mm, pos)
+                    
+                    if last == b"=":
+                        # Declaration with no array yet
+                        insert_at, chunk = pos + 1, b" [\n  " + entry
+                    elif last == b"]":
+                        # The bracket must close the array opened by "= [",
+                        # not the one in the ConjugationItem[] annotation
+                        opening = mm.find(b"= [", 0, pos)
+                        prev_pos, _ = last_non_space(mm, pos)
+                        if opening == -1 or prev_pos < opening + 2:
+                            raise ValueError("data array not found")
+                        separator = b"\n" if prev_pos == opening + 2 else b",\n"
+                        insert_at, chunk = prev_pos + 1, separator + b"  " + entry
+                    else:
+                        raise ValueError("data array not found")
+                
+                # Only the tail of the file is rewritten: the new entry and a
+                # fresh footer go over the old closing bracket
+                f.seek(insert_at)
+                f.write(chunk + b"\n" + TS_ARRAY_END.encode("utf-8"))
+                f.truncate()
         
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write("export const conjugationData: ConjugationItem[] = ")
-            json.dump(data, f, ensure_ascii=False, indent=2)
-            f.write(";")
-            
-        print("New entry added successfully!")
-    except json.JSONDecodeError:
-        print("Error: Unable to decode JSON. Initializing a new array.")
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write("export const conjugationData: ConjugationItem[] = ")
-            json.dump([new_entry], f, ensure_ascii=False, indent=2)
-            f.write(";")
+        if insert_at is None:
+            write_new_ts_file(filename, [new_entry])
+            print("Created a new TypeScript file with the entry.")
+        else:
+            print("New entry added successfully!")
+    except FileNotFoundError:
+        write_new_ts_file(filename, [new_entry])
         print("Created a new TypeScript file with the entry.")
+    except ValueError:
+        print(f"Error: Unable to find the data array in {filename}. The file was left unchanged.")
     except Exception as e:
         print(f"Error updating TypeScript file: {e}")
 